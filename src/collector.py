@@ -1,13 +1,30 @@
 import os
+import re
 import time
+import atexit
+import asyncio
+import functools
+import threading
+import aiohttp
 import requests
-import praw
+from requests.adapters import HTTPAdapter
+import asyncpraw
 import feedparser
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 from concurrent.futures import ThreadPoolExecutor
 
-@dataclass
+@dataclass(slots=True)
 class NewsItem:
     title: str
     url: str
@@ -45,36 +62,162 @@ AI_KEYWORDS = [
     'arXiv', 'Paper', 'Model', 'Dataset', 'Benchmark', 'Algorithm',
 ]
 
+# Single automaton over all keywords: one pass per text instead of one scan per keyword
+_AC = None
+if ahocorasick is not None:
+    _AC = ahocorasick.Automaton()
+    for _keyword in AI_KEYWORDS:
+        _AC.add_word(_keyword.lower(), _keyword)
+    _AC.make_automaton()
+
+# Without pyahocorasick, fall back to one compiled alternation of all keywords
+_AI_RE = re.compile("|".join(re.escape(k) for k in AI_KEYWORDS), re.IGNORECASE)
+
+# Shared keep-alive HTTP session for all synchronous collector requests
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=2))
+
 def is_ai_related(title: str, content: str = "") -> bool:
     """Check if news item is AI-related using keyword matching."""
-    text = (title + " " + content).lower()
-    return any(keyword.lower() in text for keyword in AI_KEYWORDS)
+    if _AC is not None:
+        return next(_AC.iter(f"{title} {content}".lower()), None) is not None
+    return _AI_RE.search(title) is not None or (bool(content) and _AI_RE.search(content) is not None)
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for duplicate detection (drop tracking params, fragment, trailing slash)."""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.lower().startswith("utm_")])
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower().removeprefix("www."), path, query, ""))
+
+def _title_words(title: str) -> Set[str]:
+    return set(re.findall(r"\w+", title.lower()))
+
+def source_group(item: NewsItem) -> str:
+    # 'HN', 'Reddit' or '媒体' -- subreddits and feeds of one platform share a group
+    return item.source.split("/", 1)[0]
+
+def dedupe_items(items: List[NewsItem], threshold: float = 0.8) -> List[NewsItem]:
+    """Drop items that share a URL, or a near-identical title from another source, keeping the highest score.
+
+    Titles that differ only in a version number are distinct stories and both survive:
+
+    >>> a = NewsItem("OpenAI releases GPT-5", "https://a.com/1", "HN", "1")
+    >>> b = NewsItem("OpenAI releases GPT-4o", "https://b.com/2", "Reddit/LocalLLaMA", "2")
+    >>> [item.title for item in dedupe_items([a, b])]
+    ['OpenAI releases GPT-5', 'OpenAI releases GPT-4o']
+    >>> c = NewsItem("OpenAI releases GPT-5 today", "https://c.com/3", "Reddit/OpenAI", "3", score=10)
+    >>> [item.title for item in dedupe_items([a, c])]
+    Merged duplicate 'OpenAI releases GPT-5' (HN) into 'OpenAI releases GPT-5 today' (Reddit/OpenAI)
+    ['OpenAI releases GPT-5 today']
+    """
+    by_url = {}
+    for item in items:
+        key = canonical_url(item.url)
+        if key in by_url:
+            kept, dropped = (item, by_url[key]) if item.score > by_url[key].score else (by_url[key], item)
+            print(f"Merged duplicate URL {dropped.title!r} ({dropped.source}) into {kept.title!r} ({kept.source})")
+            by_url[key] = kept
+        else:
+            by_url[key] = item
+
+    unique_items, words = [], []
+    for item in by_url.values():
+        current = _title_words(item.title)
+        for i, seen in enumerate(words):
+            if not current or source_group(item) == source_group(unique_items[i]):
+                continue
+            if len(current & seen) / len(current | seen) >= threshold:
+                kept, dropped = (item, unique_items[i]) if item.score > unique_items[i].score else (unique_items[i], item)
+                print(f"Merged duplicate {dropped.title!r} ({dropped.source}) into {kept.title!r} ({kept.source})")
+                unique_items[i], words[i] = kept, _title_words(kept.title)
+                break
+        else:
+            unique_items.append(item)
+            words.append(current)
+    return unique_items
+
+_backoff = wait_exponential(min=1, max=8)
+
+def _wait_retry_after(retry_state) -> float:
+    """Honor a numeric Retry-After on 429/503 responses, else back off exponentially."""
+    exc = retry_state.outcome.exception()
+    resp = getattr(exc, "response", None)
+    if resp is not None and resp.status_code in (429, 503):
+        retry_after = resp.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(int(retry_after), 30)
+    return _backoff(retry_state)
 
 class HackerNewsCollector:
     def __init__(self):
         self.base_url = "https://hacker-news.firebaseio.com/v0"
+        self.search_url = "https://hn.algolia.com/api/v1/search"
+        self.session = _HTTP_SESSION
 
-    def fetch_item(self, item_id):
+    async def fetch_item(self, session: aiohttp.ClientSession, item_id):
         try:
-            resp = requests.get(f"{self.base_url}/item/{item_id}.json", timeout=10)
-            return resp.json()
+            async with session.get(f"{self.base_url}/item/{item_id}.json",
+                                   timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                return json_loads(await resp.read())
         except Exception:
             return None
 
+    async def fetch_items(self, item_ids) -> list:
+        # One keep-alive pool for all item fetches to the same host
+        connector = aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            return await asyncio.gather(*[self.fetch_item(session, i) for i in item_ids])
+
+    @retry(retry=retry_if_exception_type(requests.HTTPError), wait=_wait_retry_after,
+           stop=stop_after_attempt(3), reraise=True)
+    def fetch_top_ids(self) -> list:
+        # (connect, read) timeout so a hung Firebase call can't stall the whole run
+        resp = self.session.get(f"{self.base_url}/topstories.json", timeout=(3, 10))
+        resp.raise_for_status()
+        return json_loads(resp.content)
+
+    def fetch_search_stories(self) -> list:
+        """Fetch the day's popular stories in one Algolia request, shaped like Firebase items."""
+        # With an empty query /search ranks by points within the window; 1000 is the API's page maximum
+        resp = self.session.get(self.search_url, params={
+            "tags": "story",
+            "numericFilters": f"points>30,created_at_i>{int(time.time()) - 86400}",
+            "hitsPerPage": 1000,
+        }, timeout=10)
+        resp.raise_for_status()
+        hits = json_loads(resp.content)["hits"]
+        if not hits:
+            raise ValueError("no stories returned")
+        hits.sort(key=lambda hit: hit.get("points") or 0, reverse=True)
+        return [{
+            "id": hit["objectID"],
+            "title": hit.get("title"),
+            "url": hit.get("url"),
+            "score": hit.get("points") or 0,
+            "descendants": hit.get("num_comments") or 0,
+        } for hit in hits]
+
+    def fetch_top_stories(self) -> list:
+        """Fetch the current top stories from Firebase, one request per item."""
+        top_ids = self.fetch_top_ids()[:200]
+        return asyncio.run(self.fetch_items(top_ids))
+
     def collect(self, limit=50) -> List[NewsItem]:
         print("Fetching Hacker News...")
         try:
-            top_ids = requests.get(f"{self.base_url}/topstories.json").json()[:200]
+            results = self.fetch_search_stories()
         except Exception as e:
-            print(f"Error fetching HN top stories: {e}")
-            return []
+            print(f"HN search unavailable ({e}), falling back to top stories")
+            try:
+                results = self.fetch_top_stories()
+            except Exception as e:
+                print(f"Error fetching HN top stories: {e}")
+                return []
 
         news_items = []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            results = executor.map(self.fetch_item, top_ids)
-        
         for item in results:
-            if not item or 'title' not in item or 'url' not in item:
+            if not item or not item.get('title') or not item.get('url'):
                 continue
             
             title = item['title']
@@ -94,46 +237,82 @@ class HackerNewsCollector:
         print(f"Collected {len(news_items)} items from HN.")
         return news_items
 
-class RedditCollector:
-    def __init__(self):
-        self.reddit = praw.Reddit(
+_REDDIT_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _get_reddit() -> Tuple[asyncio.AbstractEventLoop, asyncpraw.Reddit]:
+    """Process-wide Reddit client, so the OAuth token is reused across runs.
+
+    asyncpraw clients are bound to the event loop they were created on, so the
+    client lives on its own long-lived loop instead of one from asyncio.run().
+    """
+    loop = asyncio.new_event_loop()
+
+    async def create():
+        return asyncpraw.Reddit(
             client_id=os.getenv("REDDIT_CLIENT_ID"),
             client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
             user_agent=os.getenv("REDDIT_USER_AGENT", "python:ai-news-collector:v1.0")
         )
+
+    reddit = loop.run_until_complete(create())
+
+    def close():
+        loop.run_until_complete(reddit.close())
+        loop.close()
+
+    atexit.register(close)
+    return loop, reddit
+
+class RedditCollector:
+    def __init__(self):
         self.subreddits = ["MachineLearning", "LocalLLaMA", "Singularity", "ArtificialIntelligence"]
 
-    def collect(self, limit=10) -> List[NewsItem]:
-        print("Fetching Reddit...")
+    async def _fetch_sub(self, reddit: asyncpraw.Reddit, sub_name: str) -> List[NewsItem]:
         news_items = []
         try:
-            for sub_name in self.subreddits:
-                subreddit = self.reddit.subreddit(sub_name)
-                # Fetch top posts of the day
-                for submission in subreddit.top(time_filter="day", limit=5):
-                    if submission.stickied:
-                        continue
-                    
-                    # Filter out questions/help posts
-                    if "question" in submission.title.lower() or "help" in submission.title.lower():
-                        continue
-                    
-                    # Apply AI keyword filter
-                    content = submission.selftext[:1000] if submission.selftext else ""
-                    if not is_ai_related(submission.title, content):
-                        continue
+            subreddit = await reddit.subreddit(sub_name)
+            # Fetch top posts of the day
+            async for submission in subreddit.top(time_filter="day", limit=5):
+                if submission.stickied:
+                    continue
+                
+                # Filter out questions/help posts
+                if "question" in submission.title.lower() or "help" in submission.title.lower():
+                    continue
+                
+                # Apply AI keyword filter
+                content = submission.selftext[:1000] if submission.selftext else ""
+                if not is_ai_related(submission.title, content):
+                    continue
 
-                    news_items.append(NewsItem(
-                        title=submission.title,
-                        url=submission.url,
-                        source=f"Reddit/{sub_name}",
-                        original_id=submission.id,
-                        content_snippet=content,
-                        score=submission.score,
-                        comments_count=submission.num_comments
-                    ))
+                news_items.append(NewsItem(
+                    title=submission.title,
+                    url=submission.url,
+                    source=f"Reddit/{sub_name}",
+                    original_id=submission.id,
+                    content_snippet=content,
+                    score=submission.score,
+                    comments_count=submission.num_comments
+                ))
+        except Exception as e:
+            print(f"Error fetching Reddit/{sub_name}: {e}")
+        return news_items
+
+    async def _collect(self, reddit: asyncpraw.Reddit) -> List[NewsItem]:
+        results = await asyncio.gather(*[self._fetch_sub(reddit, s) for s in self.subreddits])
+        return [item for items in results for item in items]
+
+    def collect(self, limit=10) -> List[NewsItem]:
+        print("Fetching Reddit...")
+        try:
+            # The shared loop can only be driven by one caller at a time
+            with _REDDIT_LOCK:
+                loop, reddit = _get_reddit()
+                news_items = loop.run_until_complete(self._collect(reddit))
         except Exception as e:
             print(f"Error fetching Reddit: {e}")
+            news_items = []
         
         unique_items = {item.url: item for item in news_items}.values()
         print(f"Collected {len(unique_items)} items from Reddit.")
@@ -148,13 +327,31 @@ class RSSCollector:
             ("InfoQ-AI", "https://www.infoq.cn/feed/topic/33"),
         ]
 
+    def fetch_feed(self, feed_url):
+        # feedparser has no timeout of its own, so download with the shared session first
+        resp = _HTTP_SESSION.get(feed_url, timeout=5)
+        resp.raise_for_status()
+        return feedparser.parse(resp.content)
+
+    def _fetch_feed_safe(self, source_feed):
+        source_name, feed_url = source_feed
+        try:
+            return source_name, self.fetch_feed(feed_url)
+        except Exception as e:
+            print(f"Error fetching RSS {source_name}: {e}")
+            return source_name, None
+
     def collect(self, limit=10) -> List[NewsItem]:
         print("Fetching RSS Feeds (CN)...")
         news_items = []
+
+        with ThreadPoolExecutor(max_workers=len(self.feeds)) as executor:
+            feeds = list(executor.map(self._fetch_feed_safe, self.feeds))
         
-        for source_name, feed_url in self.feeds:
+        for source_name, feed in feeds:
+            if feed is None:
+                continue
             try:
-                feed = feedparser.parse(feed_url)
                 count = 0
                 for entry in feed.entries:
                     if count >= 3:  # Limit per source
@@ -182,7 +379,7 @@ class RSSCollector:
                     ))
                     count += 1
             except Exception as e:
-                print(f"Error fetching RSS {source_name}: {e}")
+                print(f"Error parsing RSS {source_name}: {e}")
 
         print(f"Collected {len(news_items)} items from RSS.")
         return news_items
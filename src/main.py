@@ -1,13 +1,42 @@
 import os
 import sys
+import asyncio
+from itertools import chain, zip_longest
+from collections import defaultdict
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from collector import HackerNewsCollector, RedditCollector, RSSCollector
+from collector import HackerNewsCollector, RedditCollector, RSSCollector, NewsItem, dedupe_items, source_group
 from processor import AIProcessor
 from publisher import MarkdownPublisher
 
 # Load environment variables
 load_dotenv()
 
+# Items worth sending to the LLM: enough votes, enough text, or a curated media source.
+# HN search hits already have >30 points, so MIN_SCORE only trims Reddit and the HN Firebase fallback.
+MIN_SCORE = 20
+MIN_SNIPPET_LENGTH = 200
+MAX_ITEMS = 40
+
+# Order in which source groups take turns when filling the MAX_ITEMS slots
+SOURCE_PRIORITY = ["媒体", "HN", "Reddit"]
+
+def is_high_signal(item: NewsItem) -> bool:
+    return item.score >= MIN_SCORE or len(item.content_snippet) > MIN_SNIPPET_LENGTH or item.source.startswith("媒体/")
+
+def select_items(items: List[NewsItem], limit: int = MAX_ITEMS) -> List[NewsItem]:
+    """Rank items by score within each source and take them round-robin across sources.
+
+    HN points and Reddit upvotes are on different scales, so they are never compared directly.
+    """
+    groups = defaultdict(list)
+    for item in items:
+        groups[source_group(item)].append(item)
+    ordered = sorted(groups, key=lambda g: SOURCE_PRIORITY.index(g) if g in SOURCE_PRIORITY else len(SOURCE_PRIORITY))
+    ranked = [sorted(groups[g], key=lambda item: item.score, reverse=True) for g in ordered]
+    return [item for item in chain.from_iterable(zip_longest(*ranked)) if item is not None][:limit]
+
 def main():
     print("🚀 Starting AI News Collector...")
 
@@ -16,29 +45,39 @@ def main():
     reddit_collector = RedditCollector()
     rss_collector = RSSCollector()
     
-    raw_items = []
-    
-    # Collect from RSS (High quality, prioritized)
-    raw_items.extend(rss_collector.collect(limit=10))
-
-    # Collect from HN
-    raw_items.extend(hn_collector.collect(limit=30))
-    
-    # Collect from Reddit (Optional: Check if configured)
+    # Collect from RSS (High quality, prioritized), HN and Reddit (Optional: Check if configured)
+    tasks = [
+        lambda: rss_collector.collect(limit=10),
+        lambda: hn_collector.collect(limit=30),
+    ]
     if os.getenv("REDDIT_CLIENT_ID"):
-        raw_items.extend(reddit_collector.collect(limit=20))
+        tasks.append(lambda: reddit_collector.collect(limit=20))
     else:
         print("Skipping Reddit (Not configured)")
 
+    # Sources are independent network I/O, so fetch them concurrently
+    raw_items = []
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        for items in executor.map(lambda f: f(), tasks):
+            raw_items.extend(items)
+
     if not raw_items:
         print("No items collected. Exiting.")
         return
 
     print(f"Total raw items collected: {len(raw_items)}")
 
+    # Sources often surface the same story, only pay for it once
+    raw_items = dedupe_items(raw_items)
+    print(f"Items after de-duplication: {len(raw_items)}")
+
+    # Skip low-signal items and cap the batch before paying for AI processing
+    raw_items = select_items([item for item in raw_items if is_high_signal(item)])
+    print(f"Items selected for AI processing: {len(raw_items)}")
+
     # 2. Processing
     processor = AIProcessor()
-    processed_items = processor.process_batch(raw_items)
+    processed_items = asyncio.run(processor.process_batch(raw_items))
 
     # 3. Publishing
     publisher = MarkdownPublisher()
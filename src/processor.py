@@ -1,9 +1,18 @@
+import io
 import os
 import json
+import time
+import asyncio
+import hashlib
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import List
-from openai import OpenAI
+import sqlite3
+from operator import attrgetter
+from typing import List, Optional, Tuple
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+from openai import AsyncOpenAI
 from tenacity import retry, stop_after_attempt, wait_fixed
 from collector import NewsItem
 
@@ -11,13 +20,71 @@ from collector import NewsItem
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of news items sent to the model per request
+BATCH_SIZE = 8
+
+# Maximum number of in-flight OpenAI requests
+MAX_CONCURRENCY = 20
+
+# Seconds a single completion may take before it is abandoned
+ITEM_TIMEOUT = 60
+BATCH_TIMEOUT = 180
+
+CACHE_PATH = os.getenv("AI_NEWS_CACHE_PATH", os.path.expanduser("~/.cache/ai-news/processed.db"))
+CACHE_TTL = 30 * 24 * 3600  # 30 days
+
+# Per-item instructions shared by the single-item and batch prompts
+TASK_REQUIREMENTS = """1. zh_title: 将标题翻译为中文。如果原标题已经是中文，直接保留。确保信达雅，吸引人但不过分标题党。
+        2. summary: 用中文写一段 100-150 字的详细摘要。必须包含核心事实、技术原理（如有）和背景意义。不要写空话。
+        3. key_points: 提取 3-5 个核心要点 (Bullet Points)，以数组形式返回。每个要点应包含具体细节（如数据、性能提升幅度、关键人物等）。
+        4. category: 从 ["🚀 模型发布", "🛠️ 工具应用", "🔬 学术研究", "💼 行业动态", "📱 社交媒体", "👔 大佬观点"] 中选择最合适的一个。
+        5. tags: 提取 3-5 个英文标签 (如 LLM, RAG, Agent, CV, Transformer)。
+        6. score: 根据新闻对 AI 领域的重要性/创新性打分 (1-5 的整数)。5分代表重大突破或行业大事件。"""
+
+class ResultCache:
+    """On-disk cache of AI results keyed by item URL and title."""
+
+    def __init__(self, path: str = CACHE_PATH, ttl: int = CACHE_TTL):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self._conn = sqlite3.connect(path)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT, created REAL)"
+            )
+            self._conn.execute("DELETE FROM results WHERE created < ?", (time.time() - self.ttl,))
+
+    @staticmethod
+    def key(item: NewsItem) -> str:
+        return hashlib.sha256(f"{item.url}|{item.title}".encode()).hexdigest()
+
+    def get(self, item: NewsItem) -> Optional[dict]:
+        row = self._conn.execute(
+            "SELECT data FROM results WHERE key = ? AND created >= ?",
+            (self.key(item), time.time() - self.ttl)
+        ).fetchone()
+        return json_loads(row[0]) if row else None
+
+    def set(self, item: NewsItem, data: dict):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, data, created) VALUES (?, ?, ?)",
+                (self.key(item), json.dumps(data, ensure_ascii=False), time.time())
+            )
+
 class AIProcessor:
     def __init__(self):
-        self.client = OpenAI(
+        self.client = AsyncOpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
             base_url=os.getenv("OPENAI_BASE_URL")
         )
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
         self.model = os.getenv("OPENAI_MODEL", "gpt-4o")
+        try:
+            self.cache = ResultCache()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Result cache disabled: {e}")
+            self.cache = None
 
     def _get_prompt(self, item: NewsItem) -> str:
         return f"""
@@ -28,12 +95,7 @@ class AIProcessor:
         内容片段: {item.content_snippet}
 
         任务要求：
-        1. zh_title: 将标题翻译为中文。如果原标题已经是中文，直接保留。确保信达雅，吸引人但不过分标题党。
-        2. summary: 用中文写一段 100-150 字的详细摘要。必须包含核心事实、技术原理（如有）和背景意义。不要写空话。
-        3. key_points: 提取 3-5 个核心要点 (Bullet Points)，以数组形式返回。每个要点应包含具体细节（如数据、性能提升幅度、关键人物等）。
-        4. category: 从 ["🚀 模型发布", "🛠️ 工具应用", "🔬 学术研究", "💼 行业动态", "📱 社交媒体", "👔 大佬观点"] 中选择最合适的一个。
-        5. tags: 提取 3-5 个英文标签 (如 LLM, RAG, Agent, CV, Transformer)。
-        6. score: 根据新闻对 AI 领域的重要性/创新性打分 (1-5 的整数)。5分代表重大突破或行业大事件。
+        {TASK_REQUIREMENTS}
 
         输出格式 (JSON):
         {{
@@ -46,52 +108,150 @@ class AIProcessor:
         }}
         """
 
+    def _get_batch_prompt(self, items: List[NewsItem]) -> str:
+        entries = "\n".join(
+            f"""
+        [{i}]
+        新闻标题: {item.title}
+        来源: {item.source}
+        内容片段: {item.content_snippet}
+        """
+            for i, item in enumerate(items)
+        )
+        return f"""
+        你是一个专业的 AI 科技新闻编辑。请逐条分析以下 {len(items)} 条新闻，并以 JSON 格式输出深度分析结果。
+        {entries}
+        任务要求（对每一条新闻）：
+        {TASK_REQUIREMENTS}
+
+        输出格式 (JSON)，results 中每条新闻一项，index 为上面方括号中的编号:
+        {{
+            "results": [
+                {{
+                    "index": 0,
+                    "zh_title": "...",
+                    "summary": "...",
+                    "key_points": ["要点1...", "要点2..."],
+                    "category": "...",
+                    "tags": ["Tag1", "Tag2"],
+                    "score": 3
+                }}
+            ]
+        }}
+        """
+
+    async def _stream_completion(self, prompt: str) -> str:
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that outputs strict JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.3,
+            stream=True
+        )
+
+        buffer = io.StringIO()
+        started = False
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    # Strict JSON opens with an object or a code fence, give up early otherwise
+                    if not started and delta.strip():
+                        if delta.lstrip()[0] not in "{`":
+                            raise ValueError(f"response is not JSON: {delta[:50]!r}")
+                        started = True
+                    buffer.write(delta)
+        finally:
+            await stream.close()
+        return buffer.getvalue()
+
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
-    def process_item(self, item: NewsItem) -> NewsItem:
+    async def _complete_json(self, prompt: str, timeout: float = ITEM_TIMEOUT) -> dict:
+        async with self.semaphore:
+            # Time-box the whole stream so a slow completion is cancelled instead of holding a slot
+            content = await asyncio.wait_for(self._stream_completion(prompt), timeout)
+
+        # Tolerate models that wrap the JSON in a markdown fence anyway
+        content = content.strip().removeprefix("```json").removeprefix("```").removesuffix("```").strip()
+
+        return json_loads(content)
+
+    def _apply_result(self, item: NewsItem, data: dict) -> NewsItem:
+        item.zh_title = data.get("zh_title", item.title)
+        item.summary = data.get("summary", "")
+        item.key_points = data.get("key_points", []) # Capture bullet points
+        item.category = data.get("category", "其他")
+        item.tags = data.get("tags", [])
+        item.ai_score = data.get("score", 3)
+        return item
+
+    def _store(self, item: NewsItem, data: dict):
+        if self.cache is not None:
+            self.cache.set(item, data)
+
+    def _mark_failed(self, item: NewsItem) -> NewsItem:
+        item.zh_title = item.title
+        item.summary = "AI 处理失败，请查看原文。"
+        item.key_points = []
+        item.category = "⚠️ 未分类"
+        item.ai_score = 1
+        return item
+
+    async def process_item(self, item: NewsItem) -> Tuple[NewsItem, Optional[dict]]:
+        """Process one item; return it with the AI result, or None if processing failed."""
         if not item.title:
-            return item
+            return item, None
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs strict JSON."},
-                    {"role": "user", "content": self._get_prompt(item)}
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.3
-            )
-            
-            content = response.choices[0].message.content
-            if content.startswith("```json"):
-                content = content[7:-3]
-            
-            data = json.loads(content)
-            
-            item.zh_title = data.get("zh_title", item.title)
-            item.summary = data.get("summary", "")
-            item.key_points = data.get("key_points", []) # Capture bullet points
-            item.category = data.get("category", "其他")
-            item.tags = data.get("tags", [])
-            item.ai_score = data.get("score", 3)
-            
+            data = await self._complete_json(self._get_prompt(item))
+            self._apply_result(item, data)
         except Exception as e:
             logger.error(f"Failed to process item {item.title}: {e}")
-            item.zh_title = item.title
-            item.summary = "AI 处理失败，请查看原文。"
-            item.key_points = []
-            item.category = "⚠️ 未分类"
-            item.ai_score = 1
+            self._mark_failed(item)
+            return item, None
             
-        return item
+        return item, data
+
+    async def process_chunk(self, items: List[NewsItem]) -> List[Tuple[NewsItem, Optional[dict]]]:
+        """Process several items in one request, falling back to per-item calls."""
+        try:
+            data = await self._complete_json(self._get_batch_prompt(items), timeout=BATCH_TIMEOUT)
+            results = {int(r["index"]): r for r in data["results"]}
+            if set(results) != set(range(len(items))):
+                raise ValueError(f"expected {len(items)} results, got indices {sorted(results)}")
+        except Exception as e:
+            logger.warning(f"Batch of {len(items)} items failed ({e}), falling back to per-item processing")
+            return list(await asyncio.gather(*(self.process_item(item) for item in items)))
+
+        return [(self._apply_result(item, results[i]), results[i]) for i, item in enumerate(items)]
+
+    def _apply_cached(self, items: List[NewsItem]) -> Tuple[List[NewsItem], List[NewsItem]]:
+        """Fill items seen on earlier runs from the cache; return (cached, pending)."""
+        if self.cache is None:
+            return [], items
+        cached, pending = [], []
+        for item in items:
+            data = self.cache.get(item)
+            if data is None:
+                pending.append(item)
+            else:
+                cached.append(self._apply_result(item, data))
+        return cached, pending
 
-    def process_batch(self, items: List[NewsItem]) -> List[NewsItem]:
-        logger.info(f"Processing {len(items)} items with AI...")
-        processed_items = []
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            results = executor.map(self.process_item, items)
-            processed_items = list(results)
+    async def process_batch(self, items: List[NewsItem]) -> List[NewsItem]:
+        processed_items, pending = self._apply_cached(items)
+        logger.info(f"Processing {len(pending)} items with AI ({len(processed_items)} cached)...")
+        chunks = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+        for results in await asyncio.gather(*(self.process_chunk(chunk) for chunk in chunks)):
+            for item, data in results:
+                processed_items.append(item)
+                # sqlite calls block, so the cache is only touched here, outside the gathered tasks
+                if data is not None:
+                    self._store(item, data)
         
         # Sort by Score
-        processed_items.sort(key=lambda x: x.ai_score, reverse=True)
+        processed_items.sort(key=attrgetter('ai_score'), reverse=True)
         return processed_items
@@ -1,14 +1,21 @@
 import os
 import datetime
+from collections import defaultdict
 from typing import List, Dict
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from collector import NewsItem
 
 class MarkdownPublisher:
     def __init__(self):
         self.template_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'templates')
         self.output_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'news')
-        self.env = Environment(loader=FileSystemLoader(self.template_dir))
+        self.env = Environment(
+            loader=FileSystemLoader(self.template_dir),
+            auto_reload=False,
+            bytecode_cache=FileSystemBytecodeCache(),  # per-user dir under the system temp dir
+            cache_size=50
+        )
+        self.template = self.env.get_template("daily_digest.md.j2")
         
         # Mapping categories to icons for visual appeal
         self.category_icons = {
@@ -23,12 +30,9 @@ class MarkdownPublisher:
 
     def publish(self, items: List[NewsItem]):
         # Group items by category
-        news_by_category: Dict[str, List[NewsItem]] = {}
+        news_by_category: Dict[str, List[NewsItem]] = defaultdict(list)
         for item in items:
-            cat = item.category if item.category else "其他"
-            if cat not in news_by_category:
-                news_by_category[cat] = []
-            news_by_category[cat].append(item)
+            news_by_category[item.category or "其他"].append(item)
 
         # Prepare context
         today_str = datetime.datetime.now().strftime("%Y-%m-%d")
@@ -36,13 +40,12 @@ class MarkdownPublisher:
             "date": today_str,
             "generation_time": datetime.datetime.now().strftime("%H:%M:%S"),
             "total_count": len(items),
-            "news_by_category": news_by_category,
+            "news_by_category": dict(news_by_category),
             "category_icons": self.category_icons
         }
 
         # Render template
-        template = self.env.get_template("daily_digest.md.j2")
-        output_content = template.render(context)
+        output_content = self.template.render(context)
 
         # Ensure directory exists
         os.makedirs(self.output_dir, exist_ok=True)